@@ -22,27 +22,58 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
-import bisect
-import collections
 from datetime import date, datetime, timedelta, timezone
 from itertools import islice
+import math
+import time
 
-import schedule
-import pandas as pd
+import numpy as np
 import pandas_market_calendars as mcal
 import pytz
 
+try:
+    import zoneinfo  # python >= 3.9
+except ImportError:
+    zoneinfo = None
+
 from .feed import AbstractDataBase
 from .metabase import MetaParams
+from .timercore import check_days, days_mask
 from .utils import date2num, num2date
-from .utils.py3 import integer_types, range, with_metaclass
+from .utils.py3 import integer_types, range, string_types, with_metaclass
 from .utils import TIME_MAX
+from .utils.dateintern import (HOURS_PER_DAY, MINUTES_PER_DAY,
+                               SECONDS_PER_DAY, MUSECONDS_PER_DAY)
 
 
 __all__ = ['SESSION_TIME', 'SESSION_START', 'SESSION_END', 'Timer']
 
 SESSION_TIME, SESSION_START, SESSION_END = range(3)
 
+NYSE_CALENDAR = mcal.get_calendar('NYSE')
+CME_CALENDAR = mcal.get_calendar('CME_Equity')
+
+# candle units -> (timedelta keyword, multiplier)
+CANDLE_UNITS = {
+    'sec': ('seconds', 1), 'secs': ('seconds', 1),
+    'min': ('minutes', 1), 'mins': ('minutes', 1),
+    'hour': ('hours', 1), 'hours': ('hours', 1),
+    'day': ('days', 1), 'days': ('days', 1),
+    'week': ('weeks', 1), 'weeks': ('weeks', 1),
+    'month': ('days', 30), 'months': ('days', 30),
+}
+
+
+def parse_candles(candles):
+    '''Converts a candles string like "5 mins" to a ``timedelta``'''
+    num, val = candles.split(' ')[:2]
+    try:
+        kw, mult = CANDLE_UNITS[val]
+    except KeyError:
+        raise ValueError('Unknown candles unit: %s' % candles)
+
+    return timedelta(**{kw: int(num) * mult})
+
 
 class Timer(with_metaclass(MetaParams, object)):
     params = (
@@ -63,6 +94,26 @@ class Timer(with_metaclass(MetaParams, object)):
 
     SESSION_TIME, SESSION_START, SESSION_END = range(3)
 
+    # state in slots, check is called on each bar. MetaParams keeps the
+    # params class in the class attribute "params": the instance params/p
+    # aliases go to __dict__
+    __slots__ = (
+        '__dict__', 'args', 'kwargs', 'lastwhen',
+        '_rstwhen', '_tzdata', '_tzinfo', '_isdata',
+        '_offset', '_repeat', '_allow',
+        '_when', '_when_dayshift', '_when_fracs', '_dwhen', '_dtwhen',
+        '_dtwhen_key', '_dtwhen_val', '_last_dt', '_last_d',
+        '_lastcall', '_lastcall_ord', '_nexteos', '_nexteos_num',
+        '_curdate', '_curdate_ord',
+        '_monthmask', '_monthcarry', '_curmonth', '_monthconsumed',
+        '_weekmask', '_weekcarry', '_curweek', '_weekconsumed',
+    )
+
+    # margin (~86 usecs in days) for num2date rounding up a timestamp: to the
+    # next day if the fraction of day is beyond _DAYEND
+    _DAYEPS = 1e-9
+    _DAYEND = 1.0 - _DAYEPS
+
     def __init__(self, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
@@ -83,98 +134,242 @@ class Timer(with_metaclass(MetaParams, object)):
         self._isdata = isinstance(self._tzdata, AbstractDataBase)
         self._reset_when()
 
-        self._nexteos = datetime.min
+        # zoneinfo (C) resolves utc offsets faster than pytz's localize
+        self._tzinfo = self._tzdata
+        # pytz fixed offsets have no zone name: nothing to convert
+        zone = getattr(self._tzdata, 'zone', None)
+        if (zoneinfo is not None and isinstance(zone, string_types) and
+                isinstance(self._tzdata, pytz.BaseTzInfo)):
+            try:
+                self._tzinfo = zoneinfo.ZoneInfo(zone)
+            except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+                pass  # keep using pytz
+
+        # params don't change once started, avoid the lookups in check
+        self._offset = self.p.offset or None
+        self._repeat = self.p.repeat or None
+        self._allow = self.p.allow
+
+        # when + offset as (day shift, day fractions) for naive targets
+        whenus = (self._rstwhen.hour * 3600 + self._rstwhen.minute * 60 +
+                  self._rstwhen.second) * 1000000 + self._rstwhen.microsecond
+        if self._offset is not None:
+            whenus += self._offset // timedelta(microseconds=1)
+        self._when_dayshift, whenus = divmod(whenus, 86400 * 1000000)
+        hour, whenus = divmod(whenus, 3600 * 1000000)
+        minute, whenus = divmod(whenus, 60 * 1000000)
+        second, microsecond = divmod(whenus, 1000000)
+        self._when_fracs = (
+            hour / HOURS_PER_DAY, minute / MINUTES_PER_DAY,
+            second / SECONDS_PER_DAY, microsecond / MUSECONDS_PER_DAY)
+
+        self._last_dt = None  # last float timestamp seen by check
+        self._last_d = None  # its datetime conversion
+        self._dtwhen_key = None  # (ddate, when, offset) of cached "when"
+        self._dtwhen_val = None  # cached (dwhen, dtwhen) for _dtwhen_key
+
+        self._set_nexteos(datetime.min)
         self._curdate = date.min
+        self._curdate_ord = self._curdate.toordinal()
+
+        # days as bitmasks, consumed days are tracked with a second bitmask
+        self._monthmask = days_mask(self.p.monthdays, 31)
+        self._weekmask = days_mask(self.p.weekdays, 7)
+        self._monthcarry = bool(self.p.monthcarry)
+        self._weekcarry = bool(self.p.weekcarry)
 
         self._curmonth = -1  # non-existent month
-        self._monthmask = collections.deque()
+        self._monthconsumed = self._monthmask  # nothing pending
 
         self._curweek = -1  # non-existent week
-        self._weekmask = collections.deque()
+        self._weekconsumed = self._weekmask  # nothing pending
 
     def _reset_when(self, ddate=datetime.min):
         self._when = self._rstwhen
         self._dtwhen = self._dwhen = None
 
         self._lastcall = ddate
+        # ordinal of the day the timer is done with, -1 if none
+        self._lastcall_ord = -1 if ddate is datetime.min else ddate.toordinal()
 
     def _check_month(self, ddate):
-        if not self.p.monthdays:
+        if not self._monthmask:  # no monthdays
             return True
 
-        mask = self._monthmask
-        daycarry = False
-        dmonth = ddate.month
-        if dmonth != self._curmonth:
-            self._curmonth = dmonth  # write down new month
-            daycarry = self.p.monthcarry and bool(mask)
-            self._monthmask = mask = collections.deque(self.p.monthdays)
-
-        dday = ddate.day
-        dc = bisect.bisect_left(mask, dday)  # "left" for days before dday
-        daycarry = daycarry or (self.p.monthcarry and dc > 0)
-        if dc < len(mask):
-            curday = bisect.bisect_right(mask, dday, lo=dc) > 0  # check dday
-            dc += curday
-        else:
-            curday = False
+        self._curmonth, self._monthconsumed, ret = check_days(
+            self._curmonth, self._monthconsumed, self._monthmask,
+            ddate.month, ddate.day, self._monthcarry)
 
-        while dc:
-            mask.popleft()
-            dc -= 1
-
-        return daycarry or curday
+        return ret
 
     def _check_week(self, ddate=date.min):
-        if not self.p.weekdays:
+        if not self._weekmask:  # no weekdays
             return True
 
         _, dweek, dwkday = ddate.isocalendar()
 
-        mask = self._weekmask
-        daycarry = False
-        if dweek != self._curweek:
-            self._curweek = dweek  # write down new month
-            daycarry = self.p.weekcarry and bool(mask)
-            self._weekmask = mask = collections.deque(self.p.weekdays)
-
-        dc = bisect.bisect_left(mask, dwkday)  # "left" for days before dday
-        daycarry = daycarry or (self.p.weekcarry and dc > 0)
-        if dc < len(mask):
-            curday = bisect.bisect_right(mask, dwkday, lo=dc) > 0  # check dday
-            dc += curday
-        else:
-            curday = False
+        self._curweek, self._weekconsumed, ret = check_days(
+            self._curweek, self._weekconsumed, self._weekmask,
+            dweek, dwkday, self._weekcarry)
+
+        return ret
 
-        while dc:
-            mask.popleft()
-            dc -= 1
+    def _set_nexteos(self, nexteos):
+        # keep the float version for the comparisons in check
+        self._nexteos = nexteos
+        if nexteos == datetime.min:
+            self._nexteos_num = float('-inf')
+        else:
+            self._nexteos_num = date2num(nexteos)
+
+    def _getnexteos(self, ddate):
+        if self._isdata:  # eos provided by data
+            nexteos, _ = self._tzdata._getnexteos()
+            return nexteos
+
+        return datetime.combine(ddate, TIME_MAX)  # generic eos
+
+    def _check_day(self, ddate):
+        # month, week and allow filters, to be called once per new day. allow
+        # is not memoized: it sees each date once and may depend on state
+        ret = self._check_month(ddate)
+        if ret:
+            ret = self._check_week(ddate)
+        if ret:
+            allow = self._allow
+            if allow is not None:
+                ret = allow(ddate)
+
+        return ret
+
+    def _calc_when(self, ddate):
+        # returns the (dwhen, dtwhen) target of the timer for ddate
+        key = (ddate, self._when, self._offset)
+        if key == self._dtwhen_key:  # already calculated for the day
+            return self._dtwhen_val
+
+        dwhen = datetime.combine(ddate, self._when)
+        if self._offset is not None:
+            dwhen += self._offset
+
+        tzdata = self._tzdata
+        if tzdata is None or (self._isdata and tzdata._tz is None):
+            # naive: same float as date2num without going through datetime
+            dord = ddate.toordinal() + self._when_dayshift
+            dtwhen = math.fsum((float(dord),) + self._when_fracs)
+        elif self._isdata:
+            dtwhen = tzdata.date2num(dwhen)
+        else:
+            tzinfo = self._tzinfo
+            if tzinfo is not tzdata:  # zoneinfo, check for a dst change
+                off0 = dwhen.replace(tzinfo=tzinfo, fold=0).utcoffset()
+                if off0 != dwhen.replace(tzinfo=tzinfo, fold=1).utcoffset():
+                    tzinfo = tzdata  # repeated/skipped time: as pytz does
+
+            dtwhen = date2num(dwhen, tz=tzinfo)
+
+        self._dtwhen_key = key
+        self._dtwhen_val = (dwhen, dtwhen)
+        return self._dtwhen_val
+
+    def check_array(self, dts):
+        '''Returns a boolean array with the results of calling ``check`` for
+        each of the (float) timestamps in ``dts``, leaving the timer in the
+        same state as those calls would.
+
+        The filters and the target time are evaluated once per day and the
+        firing points are located with ``numpy.searchsorted``. If the
+        timestamps are not sorted, the timer repeats, the end of session is
+        provided by a data feed or the timestamps do not start after the last
+        day already checked, ``check`` is called for each timestamp
+        '''
+        dts = np.asarray(dts, dtype=np.float64)
+        fired = np.zeros(len(dts), dtype=bool)
+        if not len(dts):
+            return fired
+
+        days = np.floor(dts).astype(np.int64)
+        if (self._repeat is not None or self._isdata or
+                days[0] <= self._curdate.toordinal() or
+                np.any(np.diff(dts) < 0)):
+            for i, dt in enumerate(dts.tolist()):
+                fired[i] = self.check(dt)
+
+            return fired
+
+        udays, starts = np.unique(days, return_index=True)
+        ends = np.append(starts[1:], len(dts))
+
+        sel, whens = [], []  # indices of allowed days and their targets
+        for i, dord in enumerate(udays.tolist()):
+            ddate = date.fromordinal(dord)
+            if self._check_day(ddate):
+                sel.append(i)
+                whens.append(self._calc_when(ddate))
+
+        lastwhen = None
+        if sel:
+            sel = np.array(sel)
+            dtwhens = np.array([dtwhen for _, dtwhen in whens])
+            # 1st timestamp of each day at/after the target
+            idx = np.maximum(np.searchsorted(dts, dtwhens), starts[sel])
+            ok = idx < ends[sel]
+            fired[idx[ok]] = True
+
+            if ok.any():
+                lastwhen = whens[np.flatnonzero(ok)[-1]][0]
+
+        # leave the state as if check had been called for the last day
+        self._last_dt = self._last_d = None
+        self._curdate = ddate
+        self._curdate_ord = ddate.toordinal()
+        self._set_nexteos(datetime.combine(ddate, TIME_MAX))
+        if lastwhen is not None:
+            self.lastwhen = lastwhen
+
+        if len(sel) and sel[-1] == len(udays) - 1 and not ok[-1]:
+            self._reset_when()  # last day allowed but target not yet met
+            self._dwhen, self._dtwhen = whens[-1]
+        else:
+            self._reset_when(ddate)  # last day filtered out or already fired
 
-        return daycarry or curday
+        return fired
 
     def check(self, dt):
-        d = num2date(dt)
+        # the integer part of dt is the day. Unless num2date could round dt up
+        # to the next day, answer with float comparisons (no num2date) if the
+        # timer is done for the day, or if day and session are unchanged and
+        # the target has not been reached
+        day = int(dt)
+        if dt - day < self._DAYEND:
+            if day == self._lastcall_ord:
+                return False
+
+            dtwhen = self._dtwhen
+            if (dtwhen is not None and dt < dtwhen and
+                    day <= self._curdate_ord and
+                    dt < self._nexteos_num - self._DAYEPS):
+                return False
+
+        if dt == self._last_dt:  # same timestamp, skip the conversion
+            d = self._last_d
+        else:
+            self._last_dt = dt
+            self._last_d = d = num2date(dt)
+
         ddate = d.date()
         if self._lastcall == ddate:  # not repeating, awaiting date change
             return False
 
-        if d > self._nexteos:
-            if self._isdata:  # eos provided by data
-                nexteos, _ = self._tzdata._getnexteos()
-            else:  # generic eos
-                nexteos = datetime.combine(ddate, TIME_MAX)
-            self._nexteos = nexteos
+        nexteos_fresh = d > self._nexteos
+        if nexteos_fresh:
+            self._set_nexteos(self._getnexteos(ddate))
             self._reset_when()
 
         if ddate > self._curdate:  # day change
             self._curdate = ddate
-            ret = self._check_month(ddate)
-            if ret:
-                ret = self._check_week(ddate)
-            if ret and self.p.allow is not None:
-                ret = self.p.allow(ddate)
-
-            if not ret:
+            self._curdate_ord = ddate.toordinal()
+            if not self._check_day(ddate):
                 self._reset_when(ddate)  # this day won't make it
                 return False  # timer target not met
 
@@ -182,37 +377,24 @@ class Timer(with_metaclass(MetaParams, object)):
         dwhen = self._dwhen
         dtwhen = self._dtwhen
         if dtwhen is None:
-            dwhen = datetime.combine(ddate, self._when)
-            if self.p.offset:
-                dwhen += self.p.offset
-
-            self._dwhen = dwhen
-
-            if self._isdata:
-                self._dtwhen = dtwhen = self._tzdata.date2num(dwhen)
-            else:
-                self._dtwhen = dtwhen = date2num(dwhen, tz=self._tzdata)
+            self._dwhen, self._dtwhen = dwhen, dtwhen = self._calc_when(ddate)
 
         if dt < dtwhen:
             return False  # timer target not met
 
         self.lastwhen = dwhen  # record when the last timer "when" happened
 
-        if not self.p.repeat:  # cannot repeat
+        if self._repeat is None:  # cannot repeat
             self._reset_when(ddate)  # reset and mark as called on ddate
         else:
-            if d > self._nexteos:
-                if self._isdata:  # eos provided by data
-                    nexteos, _ = self._tzdata._getnexteos()
-                else:  # generic eos
-                    nexteos = datetime.combine(ddate, TIME_MAX)
-
-                self._nexteos = nexteos
-            else:
-                nexteos = self._nexteos
+            # a fresh eos was fetched above for this same d and data state
+            if not nexteos_fresh and d > self._nexteos:
+                self._set_nexteos(self._getnexteos(ddate))
 
+            nexteos = self._nexteos
+            repeat = self._repeat
             while True:
-                dwhen += self.p.repeat
+                dwhen += repeat
                 if dwhen > nexteos:  # new schedule is beyone session
                     self._reset_when(ddate)  # reset to original point
                     break
@@ -232,42 +414,15 @@ class Timer(with_metaclass(MetaParams, object)):
 
 class ResetTimer(with_metaclass(MetaParams, object)):
     """
-    import schedule
-    import time
-
-    def job():
-        print("I'm working...")
-
-    # Run job every 3 second/minute/hour/day/week,
-    # Starting 3 second/minute/hour/day/week from now
-    schedule.every(3).seconds.do(job)
-    schedule.every(3).minutes.do(job)
-    schedule.every(3).hours.do(job)
-    schedule.every(3).days.do(job)
-    schedule.every(3).weeks.do(job)
-
-    # Run job every minute at the 23rd second
-    schedule.every().minute.at(":23").do(job)
-
-    # Run job every hour at the 42rd minute
-    schedule.every().hour.at(":42").do(job)
-
-    # Run jobs every 5th hour, 20 minutes and 30 seconds in.
-    # If current time is 02:00, first execution is at 06:20:30
-    schedule.every(5).hours.at("20:30").do(job)
-
-    # Run job every day at specific HH:MM and next HH:MM:SS
-    schedule.every().day.at("10:30").do(job)
-    schedule.every().day.at("10:30:42").do(job)
-
-    # Run job on a specific day of the week
-    schedule.every().monday.do(job)
-    schedule.every().wednesday.at("13:15").do(job)
-    schedule.every().minute.at(":17").do(job)
-
-    while True:
-    schedule.run_pending()
-    time.sleep(1)
+    Watchdog timer for live trading.
+
+    It fires every day at each of the local times in ``reset_time``
+    ("HH:MM" or "HH:MM:SS") and when, checked every ``live_test`` minutes,
+    the market is open and the last cycle of ``strategy`` is older than
+    ``cycle_mult`` candles.
+
+    The jobs are kept as an array of next fire epochs: ``check`` does a
+    single float comparison until one of them is due.
     """
     params = (
         ('tid', None),
@@ -284,6 +439,16 @@ class ResetTimer(with_metaclass(MetaParams, object)):
         ('tzdata', None),
         ('json_handler', None),  # Injected JSON file handler
     )
+
+    __slots__ = (  # see Timer.__slots__
+        '__dict__', 'args', 'kwargs', 'lastwhen', 'timer',
+        'jsonfile', 'reset_time', 'live_test', 'cycle_mult', 'market',
+        'early_trading', 'late_trading', 'strategy', 'tz', '_nowtz',
+        '_sched_cache', '_sched_cache_date', '_open_cache',
+        '_parsed_cache',
+        '_jobs', '_next_fire', '_next_fire_min',
+    )
+
     def __init__(self, *args, **kwargs):
 
         # Use injected JSON handler
@@ -302,29 +467,61 @@ class ResetTimer(with_metaclass(MetaParams, object)):
         self.late_trading = self.p.late_trading
         self.strategy = self.p.strategy
         self.tz = self.p.tzdata
+        # tzinfo to get the current time in the market timezone
+        if isinstance(self.tz, string_types):
+            self._nowtz = pytz.timezone(self.tz)
+        else:
+            self._nowtz = self.tz
 
         self.lastwhen = None
 
         self.timer=None
 
-        for t in self.reset_time:
-            schedule.every().day.at(t).do(self.daily_reset).tag('Daily reset', 'Fixed Time')
+        self._sched_cache = dict()  # market schedules for _sched_cache_date
+        self._sched_cache_date = None
+        self._open_cache = (None, None, False)  # (key, minute, is_open)
 
-        schedule.every(self.live_test).minutes.do(self.live_test_app).tag('Periodic reset', 'Minutely')
+        self._parsed_cache = dict()  # candles string -> timedelta
 
-        print("Watchdog schedule:", schedule.get_jobs())
+        # jobs as (callback, (hour, minute, second) or None if periodic)
+        self._jobs = [(self.daily_reset, self._parse_time(t))
+                      for t in self.reset_time]
+        self._jobs.append((self.live_test_app, None))
 
+        now = time.time()
+        self._next_fire = np.array(
+            [self._next_run(hms, now) for _, hms in self._jobs])
+        self._next_fire_min = self._next_fire.min()
 
-    def market_open(self):
+        print("Watchdog schedule:",
+              [datetime.fromtimestamp(x) for x in self._next_fire])
 
-        # Create a calendar
-        nyse = mcal.get_calendar('NYSE')
-        cme = mcal.get_calendar("CME_Equity")
+    @staticmethod
+    def _parse_time(t):
+        # "HH:MM" or "HH:MM:SS" -> (hour, minute, second)
+        hms = [int(x) for x in t.split(':')]
+        if not 2 <= len(hms) <= 3:
+            raise ValueError('Invalid reset time format: %s' % t)
 
-        market = self.market
-        timezone = self.tz
-        early_trading = self.early_trading
-        late_trading = self.late_trading
+        return tuple(hms + [0] * (3 - len(hms)))
+
+    def _next_run(self, hms, now):
+        # epoch of the next run of a job after epoch now
+        if hms is None:  # periodic watchdog
+            return now + self.live_test * 60.0
+
+        dnow = datetime.fromtimestamp(now)
+        hour, minute, second = hms
+        dnext = dnow.replace(hour=hour, minute=minute, second=second,
+                             microsecond=0)
+        if dnext <= dnow:
+            dnext += timedelta(days=1)
+
+        return dnext.timestamp()  # naive, local time
+
+    def _market_schedule(self, market, today, early_trading, late_trading,
+                         timezone):
+        # returns (calendar, schedule, open_at_time kwargs) for market
         rth = not any([early_trading, late_trading])
         market_times = ["market_open", "market_close"]
 
@@ -333,36 +530,114 @@ class ResetTimer(with_metaclass(MetaParams, object)):
         if late_trading:
             market_times.append("post")
 
-        today = date.today()
-        now = pd.Timestamp(datetime.now(), tz=timezone)
+        start_date = today - timedelta(days=7)
+        end_date = today + timedelta(days=7)
 
         if market == "stock":
-            stock = nyse.schedule(start_date=today - timedelta(days=7), end_date=today + timedelta(days=7), market_times=market_times,
-                                  tz=timezone)
-            try:
-                is_open = nyse.open_at_time(stock, now, only_rth=rth)
-            except ValueError:
-                is_open = False
-            return is_open
+            stock = NYSE_CALENDAR.schedule(start_date=start_date, end_date=end_date, market_times=market_times,
+                                           tz=timezone)
+            return NYSE_CALENDAR, stock, dict(only_rth=rth)
 
         elif market == "futures":
-            futures = cme.schedule(start_date=today - timedelta(days=7), end_date=today + timedelta(days=7), tz=timezone)
-            try:
-                is_open = cme.open_at_time(futures, now)
-            except ValueError:
-                is_open = False
-            return is_open
+            futures = CME_CALENDAR.schedule(start_date=start_date, end_date=end_date, tz=timezone)
+            return CME_CALENDAR, futures, dict()
+
+        elif market == "both":  # the stock hours decide
+            stock = NYSE_CALENDAR.schedule(start_date=start_date, end_date=end_date, market_times=market_times,
+                                           tz=timezone)
+            return NYSE_CALENDAR, stock, dict(only_rth=rth)
+
+        return None, None, None
+
+    @staticmethod
+    def _open_events(calendar, sched, only_rth=False):
+        # Flattens the schedule to sorted arrays of event epochs and of the
+        # market being open after each event, following the rules of
+        # calendar.open_at_time. None if the schedule has interruptions
+        cols = sched.columns
+        if cols.str.startswith("interruption_").any():
+            return None
+
+        oc_map = calendar.open_close_map
+        times, flags = [], []
+        for _, row in sched.iterrows():
+            events = sorted(((ts.timestamp(), col)
+                             for col, ts in row.dropna().items()),
+                            key=lambda x: x[0])  # stable: ties keep order
+            names = [col for _, col in events]
+            if only_rth:
+                lo = names.index("market_open")
+                hi = names.index("market_close") + 1
+                events, names = events[lo:hi], names[lo:hi]
+
+            for i, (epoch, col) in enumerate(events):
+                if col == "market_close" and names[i + 1:i + 2] == ["post"]:
+                    flag = True  # post follows: not a close
+                else:
+                    flag = bool(oc_map[col] if col in oc_map else col)
+
+                times.append(epoch)
+                flags.append(flag)
+
+        return np.array(times, dtype=np.float64), np.array(flags, dtype=bool)
+
+    @staticmethod
+    def _events_open(events, epoch):
+        # open status at epoch from the arrays of _open_events
+        times, flags = events
+        if not len(times) or epoch < times[0] or epoch > times[-1]:
+            return False  # not covered by the schedule
+
+        # status after the last event at or before epoch
+        return bool(flags[np.searchsorted(times, epoch, 'right') - 1])
+
+    def market_open(self):
+
+        market = self.market
+        timezone = self.tz
+        early_trading = self.early_trading
+        late_trading = self.late_trading
 
-        elif market == "both":
-            stock = nyse.schedule(start_date=today - timedelta(days=7), end_date=today + timedelta(days=7), market_times=market_times,
-                                  tz=timezone)
-            futures = cme.schedule(start_date=today - timedelta(days=7), end_date=today + timedelta(days=7), tz=timezone)
-            both = mcal.merge_schedules(schedules=[stock, futures], how='outer')
+        # the schedules span +/- 7 days around today, rebuild on day change
+        today = date.today()
+        if self._sched_cache_date != today:
+            self._sched_cache.clear()
+            self._sched_cache_date = today
+
+        key = (market, early_trading, late_trading, str(timezone))
+
+        # the answer doesn't change within a minute (sessions start/end at
+        # minute boundaries) and the watchdog may poll more often
+        now = time.time()
+        bucket = int(now // 60)
+        if self._open_cache[:2] == (key, bucket):
+            return self._open_cache[2]
+
+        try:
+            calendar, sched, kwargs, events = self._sched_cache[key]
+        except KeyError:
+            calendar, sched, kwargs = self._market_schedule(
+                market, today, early_trading, late_trading, timezone)
+            events = None
+            if calendar is not None:
+                events = self._open_events(calendar, sched, **kwargs)
+
+            self._sched_cache[key] = calendar, sched, kwargs, events
+
+        if calendar is None:  # unknown market
+            return None
+
+        if events is None:  # let the calendar decide
+            now = datetime.now(tz=self._nowtz)  # open_at_time takes datetimes
             try:
-                is_open = nyse.open_at_time(stock, now, only_rth=rth)
+                is_open = calendar.open_at_time(sched, now, **kwargs)
             except ValueError:
                 is_open = False
-            return is_open
+        else:
+            is_open = self._events_open(events, now)
+
+        self._open_cache = (key, bucket, is_open)
+        return is_open
 
     def daily_reset(self):
 
@@ -371,31 +646,16 @@ class ResetTimer(with_metaclass(MetaParams, object)):
 
     def live_test_app(self):
 
-        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         strategy = self.strategy
         last_cycle, filepath = self.jsonfile.readValue("strategy", strategy, "LASTCYCLE")
         candles, filepath = self.jsonfile.readValue("strategy", strategy, "CANDLES")
-        long_candles, filepath = self.jsonfile.readValue("strategy", strategy, "LONGCANDLES")
         now = datetime.now()
         cycle = datetime.strptime(last_cycle, "%Y-%m-%d %H:%M:%S")
         cycle_mult = self.cycle_mult
 
-        num = int(candles.split(' ')[0])
-        val = candles.split(' ')[1]
-
-
-        if val == "sec" or val == "secs":
-            num = timedelta(seconds=num)
-        elif val == "min" or val == "mins":
-            num = timedelta(minutes=num)
-        elif val == "hour" or val == "hours":
-            num = timedelta(hours=num)
-        elif val == "day" or val == "days":
-            num = timedelta(days=num)
-        elif val == "week" or val == "weeks":
-            num = timedelta(weeks=num)
-        elif val == "month" or val == "months":
-            num = timedelta(days=30 * num)
+        num = self._parsed_cache.get(candles)
+        if num is None:
+            num = self._parsed_cache[candles] = parse_candles(candles)
 
         self.lastwhen = now - cycle
 
@@ -412,7 +672,15 @@ class ResetTimer(with_metaclass(MetaParams, object)):
 
     def check(self):
 
-        schedule.run_pending()
+        now = time.time()
+        if now >= self._next_fire_min:  # some job is due
+            next_fire = self._next_fire
+            for i in np.flatnonzero(next_fire <= now).tolist():
+                callback, hms = self._jobs[i]
+                callback()
+                next_fire[i] = self._next_run(hms, time.time())
+
+            self._next_fire_min = next_fire.min()
 
         if self.timer:
             self.timer = False
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2020 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+# Numeric core of Timer. The functions only take and return primitives to be
+# compilable by numba in nopython mode. If numba is not available they run as
+# regular python functions
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):  # used as @njit
+            return args[0]
+
+        return lambda func: func  # used as @njit(...)
+
+
+__all__ = ['days_mask', 'check_days']
+
+
+def days_mask(days, maxday):
+    '''Returns ``days`` (month days 1-31 or iso week days 1-7 as given by
+    ``maxday``) as a bitmask with bit ``n`` set for day ``n``. The order of
+    ``days`` and duplicates are irrelevant'''
+    mask = 0
+    for d in days:
+        if not 1 <= d <= maxday:
+            raise ValueError('day %s not in range 1-%d' % (d, maxday))
+
+        mask |= 1 << d
+
+    return mask
+
+
+@njit(cache=True)
+def check_days(curperiod, consumed, mask, dperiod, dday, carry):
+    '''Checks if ``dday`` of period ``dperiod`` (month/week) is a day to
+    be considered.
+
+    ``mask`` is the bitmask of days to consider and ``consumed`` the bitmask
+    of days already gone by in ``curperiod``. ``carry`` indicates if days
+    which were not seen (in the current or in the previous period) are
+    carried over to ``dday``
+
+    Returns the tuple ``(curperiod, consumed, result)`` with the updated
+    period and consumed days
+    '''
+    daycarry = False
+    if dperiod != curperiod:
+        curperiod = dperiod  # write down new period
+        daycarry = carry and (mask & ~consumed) != 0  # left in last period
+        consumed = 0
+
+    remaining = mask & ~consumed
+    curday = (remaining >> dday) & 1 != 0
+    daycarry = daycarry or (carry and remaining & ((1 << dday) - 1) != 0)
+    consumed |= (1 << (dday + 1)) - 1  # dday and all days before it
+
+    return curperiod, consumed, daycarry or curday
@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import datetime
+import functools
 import math
 import time as _time
 
@@ -146,21 +147,9 @@ SECONDS_PER_DAY = SECONDS_PER_MINUTE * MINUTES_PER_DAY
 MUSECONDS_PER_DAY = MUSECONDS_PER_SECOND * SECONDS_PER_DAY
 
 
-def num2date(x, tz=None, naive=True):
+def _num2date(x, tz=None, naive=True):
     # Same as matplotlib except if tz is None a naive datetime object
     # will be returned.
-    """
-    *x* is a float value which gives the number of days
-    (fraction part represents hours, minutes, seconds) since
-    0001-01-01 00:00:00 UTC *plus* *one*.
-    The addition of one here is a historical artifact.  Also, note
-    that the Gregorian calendar is assumed; this is not universal
-    practice.  For details, see the module docstring.
-    Return value is a :class:`datetime` instance in timezone *tz* (default to
-    rcparams TZ value).
-    If *x* is a sequence, a sequence of :class:`datetime` objects will
-    be returned.
-    """
 
     ix = int(x)
     dt = datetime.datetime.fromordinal(ix)
@@ -191,6 +180,32 @@ def num2date(x, tz=None, naive=True):
     return dt
 
 
+@functools.lru_cache(maxsize=4096)
+def _num2date_cached(x, tz, naive):
+    return _num2date(x, tz, naive)
+
+
+def num2date(x, tz=None, naive=True):
+    """
+    *x* is a float value which gives the number of days
+    (fraction part represents hours, minutes, seconds) since
+    0001-01-01 00:00:00 UTC *plus* *one*.
+    The addition of one here is a historical artifact.  Also, note
+    that the Gregorian calendar is assumed; this is not universal
+    practice.  For details, see the module docstring.
+    Return value is a :class:`datetime` instance in timezone *tz* (default to
+    rcparams TZ value).
+    If *x* is a sequence, a sequence of :class:`datetime` objects will
+    be returned.
+    """
+    # timestamps are usually converted several times (timers, feeds sharing
+    # the bar, ...) and datetimes are immutable: use a cache if tz hashes
+    try:
+        return _num2date_cached(x, tz, naive)
+    except TypeError:  # unhashable tz (or x)
+        return _num2date(x, tz, naive)
+
+
 def num2dt(num, tz=None, naive=True):
     return num2date(num, tz=tz, naive=naive).date()
 
@@ -206,7 +221,11 @@ def date2num(dt, tz=None):
     is a :func:`float`.
     """
     if tz is not None:
-        dt = tz.localize(dt)
+        localize = getattr(tz, 'localize', None)
+        if localize is not None:  # pytz (or patched by Localizer)
+            dt = localize(dt)
+        else:  # plain tzinfo (ex: zoneinfo)
+            dt = dt.replace(tzinfo=tz)
 
     if hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
         delta = dt.tzinfo.utcoffset(dt)
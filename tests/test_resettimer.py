@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2020 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import time
+
+import pytz
+
+import testcommon
+
+from backtrader.timer import ResetTimer
+
+
+class JsonHandler(object):
+    def readValue(self, *args):
+        return None, None
+
+
+def test_run(main=False):
+    rtimer = ResetTimer(reset_time=['09:30'], json_handler=JsonHandler())
+
+    # reset times and the next run of the jobs (in local time)
+    assert rtimer._parse_time('09:30') == (9, 30, 0)
+    assert rtimer._parse_time('17:05:30') == (17, 5, 30)
+    for badtime in ('9', '1:2:3:4'):
+        try:
+            rtimer._parse_time(badtime)
+        except ValueError:
+            pass
+        else:
+            assert False, badtime
+
+    now = datetime.datetime(2021, 3, 1, 10, 0)
+    epoch = now.timestamp()
+    assert rtimer._next_run(None, epoch) == epoch + 60.0  # live_test mins
+    checks = (
+        ((10, 0, 1), now.replace(second=1)),  # later today
+        ((10, 0, 0), now + datetime.timedelta(days=1)),  # now: tomorrow
+        ((9, 30, 0), datetime.datetime(2021, 3, 2, 9, 30)),
+    )
+    for hms, expected in checks:
+        nextrun = rtimer._next_run(hms, epoch)
+        if main:
+            print(hms, datetime.datetime.fromtimestamp(nextrun))
+
+        assert nextrun == expected.timestamp()
+
+    # a due job runs once and is rescheduled
+    assert not rtimer.check()
+    rtimer._next_fire[0] = rtimer._next_fire_min = 0.0
+    t0 = time.time()
+    assert rtimer.check()
+    t1 = time.time()
+    assert not rtimer.check()
+    # rescheduled from the time of the run (same result unless 09:30 was
+    # crossed in between)
+    nextruns = (rtimer._next_run((9, 30, 0), t0),
+                rtimer._next_run((9, 30, 0), t1))
+    assert rtimer._next_fire[0] in nextruns
+    assert rtimer._next_fire_min == rtimer._next_fire.min() > t1
+
+    # the open/close event arrays must answer as the calendar does: at, just
+    # before and between the events. The week of thanksgiving 2021 has a dst
+    # change and early closes
+    today = datetime.date(2021, 11, 24)
+    checks = (
+        ('America/New_York', 'stock', False, False),
+        ('America/New_York', 'stock', True, False),
+        ('America/New_York', 'stock', False, True),
+        ('America/New_York', 'stock', True, True),
+        ('America/New_York', 'futures', False, False),
+        ('America/New_York', 'both', True, True),
+        ('Europe/Berlin', 'stock', True, True),
+    )
+    for tzname, market, early, late in checks:
+        calendar, sched, kwargs = rtimer._market_schedule(
+            market, today, early, late, tzname)
+        events = rtimer._open_events(calendar, sched, **kwargs)
+        assert events is not None
+
+        times = events[0].tolist()
+        epochs = [times[0] - 3600.0, times[-1] + 3600.0]
+        for t0, t1 in zip(times, times[1:] + [times[-1]]):
+            epochs += [t0 - 1.0, t0, (t0 + t1) / 2.0]
+
+        mismatches = 0
+        for epoch in epochs:
+            now = datetime.datetime.fromtimestamp(epoch, pytz.utc)
+            try:
+                expected = calendar.open_at_time(sched, now, **kwargs)
+            except ValueError:  # not covered by the schedule
+                expected = False
+
+            mismatches += rtimer._events_open(events, epoch) != expected
+
+        if main:
+            print(tzname, market, early, late, len(epochs), mismatches)
+
+        assert not mismatches
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2020 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import pytz
+
+import testcommon
+
+import backtrader as bt
+from backtrader.timer import Timer, zoneinfo
+
+
+def _dts(start, minutes, num):
+    step = datetime.timedelta(minutes=minutes)
+    return [bt.date2num(start + i * step) for i in range(num)]
+
+
+def _timers():
+    t = datetime.time
+    yield dict(when=t(10, 30))
+    yield dict(when=t(10, 30), offset=datetime.timedelta(minutes=-45))
+    yield dict(when=t(15, 0), monthdays=[1, 15, 28], monthcarry=True)
+    yield dict(when=t(15, 0), monthdays=[3, 20], monthcarry=False)
+    yield dict(when=t(9, 0), weekdays=[1, 3, 5], weekcarry=True)
+    yield dict(when=t(9, 0), allow=lambda d: d.day % 2)
+    yield dict(when=t(9, 0), repeat=datetime.timedelta(hours=5))
+
+
+def test_run(main=False):
+    start = datetime.datetime(2020, 2, 27, 8, 0)
+    for dtmin in (7, 60 * 25):
+        dts = _dts(start, dtmin, 2000)
+        half = len(dts) // 2
+
+        for kwargs in _timers():
+            timer = Timer(**kwargs)
+            timer.start(None)
+            checks = [timer.check(dt) for dt in dts]
+
+            timer = Timer(**kwargs)
+            timer.start(None)
+            fired = timer.check_array(dts[:half]).tolist()
+            # the timer must be left ready to go on with check
+            fired += [timer.check(dt) for dt in dts[half:]]
+
+            if main:
+                print(kwargs, sum(checks), sum(fired))
+
+            assert any(checks)
+            assert checks == fired
+
+    # days pending from before the start are carried without consuming the
+    # next scheduled day of the month
+    dts = _dts(datetime.datetime(2021, 1, 10, 13, 0), 60 * 24, 40)
+    checks = (
+        ([1, 15], True, [10, 15, 1, 15]),
+        ([3, 20], False, [20, 3]),
+    )
+    for monthdays, monthcarry, expected in checks:
+        timer = Timer(when=datetime.time(12, 0),
+                      monthdays=monthdays, monthcarry=monthcarry)
+        timer.start(None)
+        days = [bt.num2date(dt).day for dt in dts if timer.check(dt)]
+
+        if main:
+            print(monthdays, monthcarry, days)
+
+        assert days == expected
+
+    # days are normalized once: order and duplicates are irrelevant
+    kwargs = dict(when=datetime.time(12, 0), weekdays=[5, 1, 3, 1, 5])
+    timer = Timer(**kwargs)
+    timer.start(None)
+    checks = [timer.check(dt) for dt in dts]
+
+    kwargs['weekdays'] = [1, 3, 5]
+    timer = Timer(**kwargs)
+    timer.start(None)
+    assert checks == [timer.check(dt) for dt in dts]
+
+    # pytz fixed offsets (no zone name) are used as given: 10:00 at +01:00
+    timer = Timer(when=datetime.time(10, 0), tzdata=pytz.FixedOffset(60))
+    timer.start(None)
+    dts = _dts(datetime.datetime(2021, 3, 1, 8, 0), 15, 4 * 24 * 3)
+    fired = [bt.num2date(dt) for dt in dts if timer.check(dt)]
+
+    if main:
+        print('fixed offset', fired)
+
+    assert fired == [datetime.datetime(2021, 3, d, 9, 0) for d in (1, 2, 3)]
+
+    # named zones go through zoneinfo: same targets and firing times as with
+    # pytz, also for the skipped/repeated times of the dst changes
+    checks = (
+        ('US/Eastern', (1, 30), datetime.date(2021, 3, 12)),
+        ('US/Eastern', (2, 30), datetime.date(2021, 3, 12)),
+        ('US/Eastern', (1, 30), datetime.date(2021, 11, 5)),
+        ('US/Eastern', (2, 30), datetime.date(2021, 11, 5)),
+        ('Europe/Dublin', (0, 30), datetime.date(2021, 3, 26)),
+        ('Europe/Dublin', (1, 30), datetime.date(2021, 3, 26)),
+        ('Europe/Dublin', (1, 30), datetime.date(2021, 10, 29)),
+        ('Europe/Dublin', (2, 30), datetime.date(2021, 10, 29)),
+    )
+    for tzname, hm, fromdate in checks:
+        tz = pytz.timezone(tzname)
+        when = datetime.time(*hm)
+        timer = Timer(when=when, tzdata=tz)
+        timer.start(None)
+        assert zoneinfo is None or isinstance(timer._tzinfo, zoneinfo.ZoneInfo)
+
+        days = [fromdate + datetime.timedelta(days=i) for i in range(5)]
+        targets = [bt.date2num(datetime.datetime.combine(d, when), tz=tz)
+                   for d in days]
+        assert [timer._calc_when(d)[1] for d in days] == targets
+
+        # the days of the (utc) bars decide the targets which are checked
+        timer = Timer(when=when, tzdata=tz)
+        timer.start(None)
+        dts = _dts(datetime.datetime.combine(days[0], datetime.time()),
+                   5, 288 * len(days))
+        fired = [dt for dt in dts if timer.check(dt)]
+        expected = [min(dt for dt in dts if int(dt) == int(dts[0]) + i and
+                        dt >= target)
+                    for i, target in enumerate(targets)]
+
+        if main:
+            print(tzname, when, [bt.num2date(dt) for dt in fired])
+
+        assert fired == expected
+
+
+if __name__ == '__main__':
+    test_run(main=True)